@@ -23,26 +23,157 @@ Developed by Dilhara Jayawardhana
 """
 
 # --- Core Imports ---
+import os
 import socket
 import mimetypes
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import mmap
+import re
+import signal
+import stat
+import sys
+import datetime
+import email.utils
+import gzip
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 
 # --- Optional Imports for Enhanced Features ---
 try:
     # Pillow is used for advanced image metadata (dimensions, color palette, etc.)
-    from PIL import Image
+    import PIL
+    from PIL import Image, ImageFile, ImageOps, features
     from collections import Counter
+    # A larger encoder buffer lets thumbnails be written in a single pass.
+    ImageFile.MAXBLOCK = 2 ** 22
+    # Decode what is there of files that are still being copied in, rather
+    # than failing the request.
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+    # Pillow-SIMD is a drop-in fork with vectorized resizing; its releases are
+    # tagged with a ".postN" suffix on the upstream version.
+    PIL_SIMD = '.post' in PIL.__version__
+    # Pillow 9.1 moved the resampling filters into the Image.Resampling enum.
+    RESAMPLING = getattr(Image, 'Resampling', Image)
+    # WebP needs libwebp, which some Pillow builds leave out.
+    WEBP_AVAILABLE = features.check('webp')
     PIL_AVAILABLE = True
 except ImportError:
     # If Pillow is not installed, the server will still run but with fewer features.
     PIL_AVAILABLE = False
 
+try:
+    # NumPy vectorizes the per-pixel work in palette and histogram extraction.
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # Without NumPy, the pure-Python fallbacks are used instead.
+    NUMPY_AVAILABLE = False
+
+try:
+    # Brotli compresses the pre-encoded image copies better than gzip.
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    # Without Brotli, only gzip copies are made.
+    BROTLI_AVAILABLE = False
+
 # --- Global Configuration ---
+# The gallery serves the images in the folder this script lives in. Paths on
+# the request path are plain strings, which are much cheaper than Path objects.
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 # Set of recognized image file extensions.
-IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.ico', '.tiff', '.tif'}
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.ico', '.tiff', '.tif'})
+# MIME types for the extensions above, so serving them needs no registry lookup.
+IMAGE_MIME_TYPES = {
+    '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.gif': 'image/gif',
+    '.webp': 'image/webp', '.bmp': 'image/bmp', '.svg': 'image/svg+xml',
+    '.ico': 'image/vnd.microsoft.icon', '.tiff': 'image/tiff', '.tif': 'image/tiff',
+}
+# Units used by format_file_size(), in steps of 1024.
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+# Maximum number of images whose encoded metadata is kept in memory.
+METADATA_CACHE_SIZE = 1024
+# Maximum number of files whose response headers are kept in memory.
+FILE_INFO_CACHE_SIZE = 4096
+# Files up to this size are kept in memory once read, such as thumbnails.
+SMALL_FILE_SIZE = 256 * 1024
+# Total bytes of file contents kept in memory.
+FILE_BODY_CACHE_BYTES = 128 * 1024 * 1024
+# Block size for streaming files where os.sendfile() is not available.
+COPY_BUFFER_SIZE = 256 * 1024
+# Without os.sendfile(), bodies at least this large are sent from an mmap.
+MMAP_THRESHOLD = 64 * 1024
+# A single `Range: bytes=first-last` request; either end may be omitted.
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)')
+# Images with fewer pixels than this get no palette or histogram.
+MIN_ANALYSIS_PIXELS = 64 * 64
+# Longest edge, in pixels, of the thumbnails shown in the gallery grid.
+THUMBNAIL_SIZE = 400
+# Thumbnails are WebP, which is smaller than JPEG at the same quality and
+# keeps transparency; JPEG is the fallback without libwebp.
+THUMBNAIL_FORMAT, THUMBNAIL_SUFFIX = ('WEBP', '.webp') if PIL_AVAILABLE and WEBP_AVAILABLE else ('JPEG', '.jpg')
+# Thumbnails and pre-encoded images are cached in a hidden folder next to
+# the images.
+CACHE_DIR = os.path.join(SCRIPT_DIR, '.cache')
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, 'thumbs')
+ENCODED_DIR = os.path.join(CACHE_DIR, 'encoded')
+# Computed metadata is saved here on shutdown and reloaded on startup.
+METADATA_CACHE_FILE = os.path.join(CACHE_DIR, 'metadata.json')
+# Formats shown as-is in the grid, since a still JPEG would lose the vector
+# or the animation.
+THUMBNAIL_PASSTHROUGH = {'.svg', '.gif'}
+# Modes that convert to 8-bit RGB without loss of range. Pillow clips 16- and
+# 32-bit grayscale (I;16, I, F) when converting, so those are shown as-is.
+THUMBNAIL_MODES = {'1', 'L', 'LA', 'P', 'PA', 'RGB', 'RGBA', 'CMYK', 'YCbCr'}
+# Formats stored without compression of their own, which shrink a lot under
+# gzip or Brotli. Other formats are already compressed.
+PRECOMPRESS_EXTENSIONS = {'.bmp', '.svg', '.ico', '.tiff', '.tif'}
+# Content-Encoding name, file suffix and compressor for each pre-encoded copy,
+# most preferred first.
+ENCODINGS = ([('br', '.br', brotli.compress)] if BROTLI_AVAILABLE else []) + [
+    ('gzip', '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+]
+# Socket option that holds back partial packets until it is cleared, which
+# also sends the last one. Only Linux TCP_CORK documents that flush; BSD and
+# macOS TCP_NOPUSH could leave it unsent, so other platforms never cork.
+CORK_OPTION = getattr(socket, 'TCP_CORK', None)
+# Kernel send buffer per connection, so sendfile() can queue large images.
+SEND_BUFFER_SIZE = 1024 * 1024
+# Number of server processes. Pillow work is serialized by the GIL within a
+# process, so busy galleries can run one process per core. Each process binds
+# its own socket with SO_REUSEPORT and the kernel spreads connections across
+# them. Only Linux balances accepts that way, so other platforms use one process.
+WORKER_PROCESSES = 1
+
+# --- Server-side Caches ---
+# Encoded metadata per image path, stored as ((mtime_ns, size), json_bytes)
+# in least-recently-used order.
+_metadata_cache = OrderedDict()
+_metadata_lock = threading.Lock()
+# Encoded image list, plain and gzipped, with its ETag; valid while the
+# directory's mtime_ns is unchanged.
+_listing_cache = {'mtime': None, 'body': None, 'gzip_body': None, 'etag': None}
+_listing_lock = threading.Lock()
+# FileInfo per file path, stored as ((inode, mtime_ns, size), info) in
+# least-recently-used order.
+_file_info_cache = OrderedDict()
+_file_info_lock = threading.Lock()
+# Contents of small files per path, stored as (etag, bytes) in
+# least-recently-used order, with their total size.
+_file_body_cache = OrderedDict()
+_file_body_cache_bytes = 0
+_file_body_lock = threading.Lock()
+# The Date header for the current second, as (second, string). The tuple is
+# replaced as a whole, so threads never see a half-updated pair.
+_date_header = (None, None)
+# Pillow decoding is CPU-bound, so it runs on a pool sized to the machine
+# rather than on every request thread at once.
+_analysis_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
 
 
 # --- Utility Functions ---
@@ -82,17 +213,45 @@ def find_available_port(start_port=8000):
     return start_port
 
 
+def analyze_image(img):
+    """
+    Computes the color palette and RGB histogram for a Pillow Image object.
+    The image is converted and downscaled once, and both results are derived
+    from that same thumbnail. Requires Pillow to be installed.
+    """
+    # Convert to RGB to ensure consistency; this also returns a new image.
+    img = img.convert('RGB')
+    # Resize to a small thumbnail for faster processing. Colors are quantized
+    # and binned afterwards, so the cheaper bilinear filter is plenty.
+    img.thumbnail((200, 200), RESAMPLING.BILINEAR)
+    # With NumPy, both helpers work on a single array view of the pixels.
+    pixels = np.asarray(img) if NUMPY_AVAILABLE else img
+    return get_color_palette(pixels), get_histogram_data(pixels)
+
+
 def get_color_palette(img, num_colors=5):
     """
-    Extracts a dominant color palette from a Pillow Image object.
-    Requires Pillow to be installed.
+    Extracts a dominant color palette from an RGB thumbnail, given as a
+    NumPy array when NumPy is available and as a Pillow Image otherwise.
     """
-    # Create a copy and convert to RGB to ensure consistency.
-    img = img.copy().convert('RGB')
-    # Resize to a small thumbnail for faster processing.
-    img.thumbnail((100, 100))
-    # Get all pixel data and reduce color depth to group similar colors.
-    pixels = list(img.getdata())
+    if NUMPY_AVAILABLE:
+        # Reduce color depth on the whole array at once; masking with 0xE0 is
+        # equivalent to `v // 32 * 32` for 8-bit channels.
+        arr = img & 0xE0
+        # Pack each reduced (r, g, b) triple into a single integer key.
+        keys = (arr[..., 0].astype(np.uint32) << 16) | (arr[..., 1].astype(np.uint32) << 8) | arr[..., 2]
+        colors, counts = np.unique(keys.ravel(), return_counts=True)
+        # Partially sort to find the most common colors, then order just those.
+        # When every color is wanted the partition step can be skipped.
+        if counts.size > num_colors:
+            top = np.argpartition(-counts, num_colors - 1)[:num_colors]
+        else:
+            top = np.arange(counts.size)
+        top = top[np.argsort(-counts[top], kind='stable')]
+        return [f'#{int(c):06x}' for c in colors[top]]
+    # Halve the thumbnail to keep the pure-Python loop short, then get all
+    # pixel data and reduce color depth to group similar colors.
+    pixels = list(img.reduce(2).getdata())
     reduced = [(r // 32 * 32, g // 32 * 32, b // 32 * 32) for r, g, b in pixels]
     # Count the occurrences of each reduced color.
     color_counts = Counter(reduced)
@@ -104,11 +263,18 @@ def get_color_palette(img, num_colors=5):
 
 def get_histogram_data(img):
     """
-    Generates RGB histogram data from a Pillow Image object.
-    Requires Pillow to be installed.
+    Generates RGB histogram data from an RGB thumbnail, given as a
+    NumPy array when NumPy is available and as a Pillow Image otherwise.
     """
-    img = img.convert('RGB')
-    img.thumbnail((200, 200))
+    if NUMPY_AVAILABLE:
+        # Tally each channel directly; one row per channel so all three can
+        # be normalized and downsampled at once.
+        hist = np.stack([np.bincount(img[..., c].ravel(), minlength=256) for c in range(3)])
+        max_val = int(hist.max())
+        if max_val > 0:
+            hist = hist * 100 // max_val
+        r_hist, g_hist, b_hist = hist[:, ::4].tolist()
+        return {'r': r_hist, 'g': g_hist, 'b': b_hist}
     # Get histogram for all color channels.
     histogram = img.histogram()
     # Split into individual R, G, B channels.
@@ -127,34 +293,50 @@ def format_file_size(size):
     """
     Formats a file size in bytes into a human-readable string (KB, MB, GB).
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024.0:
-            return f"{size:.1f} {unit}"
-        size /= 1024.0
-    return f"{size:.1f} TB"
+    # Each unit is 2**10 times the previous one, so the bit length of the size
+    # picks the unit directly.
+    index = 0 if size < 1024 else min((size.bit_length() - 1) // 10, len(FILE_SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * index)):.1f} {FILE_SIZE_UNITS[index]}"
 
 
-def get_image_metadata(file_path):
+def get_image_metadata(file_path, st=None):
     """
     Gathers metadata for a given image file.
     If Pillow is available, it extracts advanced data like dimensions and color palette.
+    `st` may be an os.stat_result the caller already has for the file.
     """
+    if st is None:
+        st = file_path.stat()
+    size = st.st_size
     metadata = {
         'filename': file_path.name,
-        'size': file_path.stat().st_size,
-        'size_formatted': format_file_size(file_path.stat().st_size),
+        'size': size,
+        'size_formatted': format_file_size(size),
     }
-    if PIL_AVAILABLE:
+    # Pillow cannot read vector images, so there is nothing more to extract.
+    if PIL_AVAILABLE and file_path.suffix.lower() != '.svg':
         try:
             with Image.open(file_path) as img:
+                # Record the true dimensions and mode before draft() changes them.
+                width, height = img.size
                 metadata.update({
-                    'dimensions': f"{img.width}×{img.height}",
-                    'width': img.width,
-                    'height': img.height,
+                    'dimensions': f"{width}×{height}",
+                    'width': width,
+                    'height': height,
                     'format': img.format,
                     'mode': img.mode,
-                    'palette': get_color_palette(img),
-                    'histogram': get_histogram_data(img)
+                })
+                # Icons and tiny images have too few pixels for a useful palette
+                # or histogram, so skip the analysis for them.
+                if img.format == 'ICO' or width * height < MIN_ANALYSIS_PIXELS:
+                    return metadata
+                # Let the JPEG decoder shrink on load; the analysis below only
+                # needs a small thumbnail. This is a no-op for other formats.
+                img.draft('RGB', (200, 200))
+                palette, histogram = analyze_image(img)
+                metadata.update({
+                    'palette': palette,
+                    'histogram': histogram
                 })
         except Exception as e:
             # If Pillow fails to process the file, record the error.
@@ -162,6 +344,348 @@ def get_image_metadata(file_path):
     return metadata
 
 
+def get_metadata_json(file_path):
+    """
+    Returns the metadata for an image as encoded JSON.
+    The result is cached and reused for as long as the file's modification
+    time and size stay the same.
+    """
+    key = str(file_path)
+    st = os.stat(file_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _metadata_lock:
+        cached = _metadata_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            _metadata_cache.move_to_end(key)
+            return cached[1]
+    # Analyze outside the lock so other requests are not held up.
+    metadata = _analysis_pool.submit(get_image_metadata, Path(file_path), st).result()
+    body = json.dumps(metadata).encode('utf-8')
+    with _metadata_lock:
+        _metadata_cache[key] = (stamp, body)
+        _metadata_cache.move_to_end(key)
+        # Evict the least recently used entries once the cache is full.
+        while len(_metadata_cache) > METADATA_CACHE_SIZE:
+            _metadata_cache.popitem(last=False)
+    return body
+
+
+def load_metadata_cache():
+    """
+    Fills the metadata cache from the file written by save_metadata_cache(),
+    so unchanged images are not analyzed again after a restart.
+    Entries are still checked against each file's mtime and size when used.
+    """
+    try:
+        with open(METADATA_CACHE_FILE, encoding='utf-8') as f:
+            entries = [(key, ((mtime_ns, size), body.encode('utf-8')))
+                       for key, mtime_ns, size, body in json.load(f)[-METADATA_CACHE_SIZE:]]
+    except (OSError, ValueError, TypeError, AttributeError):
+        # No saved cache yet, or an unreadable one: start empty.
+        return
+    with _metadata_lock:
+        _metadata_cache.update(entries)
+
+
+def save_metadata_cache():
+    """
+    Writes the metadata cache to disk, least recently used entries first.
+    """
+    with _metadata_lock:
+        entries = [[key, stamp[0], stamp[1], body.decode('utf-8')]
+                   for key, (stamp, body) in _metadata_cache.items()]
+    # Write to a temporary name first so a crash cannot leave half a file.
+    tmp_path = f'{METADATA_CACHE_FILE}.tmp'
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, METADATA_CACHE_FILE)
+    except OSError:
+        # A read-only folder just means metadata is recomputed next time.
+        pass
+
+
+def create_thumbnail(file_path, thumb_path, st):
+    """
+    Renders a thumbnail of an image to `thumb_path` and returns that path.
+    Returns None if the image cannot be decoded, has a mode that would be
+    clipped on conversion, or has transparency and thumbnails are JPEG,
+    which cannot store it. Requires Pillow to be installed.
+    """
+    # Write to a temporary name first so no request sees a partial file.
+    # Thread idents repeat across forked workers, so the pid is included too.
+    tmp_path = f'{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with Image.open(file_path) as img:
+            if img.mode not in THUMBNAIL_MODES:
+                return None
+            has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+            if has_alpha and THUMBNAIL_FORMAT == 'JPEG':
+                return None
+            # Only an RGB profile still describes the converted pixels.
+            icc_profile = img.info.get('icc_profile') if img.mode in ('RGB', 'RGBA') else None
+            # Let the JPEG decoder shrink on load; thumbnail() does the rest.
+            img.draft('RGB', (THUMBNAIL_SIZE * 2, THUMBNAIL_SIZE * 2))
+            # Apply the EXIF orientation, since the thumbnail does not carry it.
+            thumb = ImageOps.exif_transpose(img).convert('RGBA' if has_alpha else 'RGB')
+        thumb.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), RESAMPLING.LANCZOS)
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        if THUMBNAIL_FORMAT == 'WEBP':
+            thumb.save(tmp_path, 'WEBP', quality=80, method=4, icc_profile=icc_profile)
+        else:
+            thumb.save(tmp_path, 'JPEG', quality=82, optimize=True, icc_profile=icc_profile)
+        # Stamp the source's mtime so later requests can tell if it is stale.
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, thumb_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return thumb_path
+
+
+def get_thumbnail(file_path):
+    """
+    Returns the path of the cached thumbnail for an image, creating it first
+    if it is missing or older than the image.
+    Returns None when the original image should be served instead.
+    """
+    if not PIL_AVAILABLE or os.path.splitext(file_path)[1].lower() in THUMBNAIL_PASSTHROUGH:
+        return None
+    st = os.stat(file_path)
+    thumb_path = get_thumbnail_path(file_path)
+    if is_thumbnail_current(thumb_path, st):
+        return thumb_path
+    return _analysis_pool.submit(create_thumbnail, file_path, thumb_path, st).result()
+
+
+def get_thumbnail_path(file_path):
+    """
+    Returns where the cached thumbnail for an image lives.
+    """
+    return os.path.join(THUMBNAIL_DIR, os.path.basename(file_path) + THUMBNAIL_SUFFIX)
+
+
+def is_thumbnail_current(thumb_path, st):
+    """
+    Checks that a thumbnail exists and carries its source's mtime, `st`.
+    """
+    try:
+        return os.stat(thumb_path).st_mtime_ns == st.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def create_missing_thumbnails(directory):
+    """
+    Renders the thumbnails that are missing or stale for the images in
+    `directory`, so the first visit to the gallery does not decode them all.
+    Runs one image at a time, leaving the analysis pool free for requests.
+    """
+    if not PIL_AVAILABLE:
+        return
+    with os.scandir(directory) as entries:
+        sources = [e for e in entries
+                   if e.is_file() and os.path.splitext(e.name)[1].lower() in IMAGE_EXTENSIONS
+                   and os.path.splitext(e.name)[1].lower() not in THUMBNAIL_PASSTHROUGH]
+    for entry in sources:
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        thumb_path = get_thumbnail_path(entry.path)
+        if not is_thumbnail_current(thumb_path, st):
+            create_thumbnail(entry.path, thumb_path, st)
+
+
+def resolve_image_path(filename):
+    """
+    Returns the path of the image `filename` names inside the gallery folder,
+    or None if it is not an image or the name leads outside the folder.
+    """
+    # The extension check is free, so obvious junk never reaches the filesystem.
+    if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    # The OS cannot store NUL bytes in names, and os.stat() raises on them.
+    if '\x00' in filename:
+        return None
+    # The gallery is flat, and cached thumbnails and encoded copies are named
+    # after the image alone, so only plain names are accepted. This also
+    # keeps the .cache folder from being served as gallery content.
+    if os.sep in filename or (os.altsep and os.altsep in filename):
+        return None
+    # normpath() collapses '..' segments without touching the filesystem, so
+    # names that escape the folder are rejected before any stat(). Symlinks
+    # placed in the folder are followed, just like the listing does.
+    full_path = os.path.normpath(os.path.join(SCRIPT_DIR, filename))
+    try:
+        if os.path.commonpath((full_path, SCRIPT_DIR)) != SCRIPT_DIR:
+            return None
+    except ValueError:
+        # On Windows, a path on another drive.
+        return None
+    return full_path
+
+
+# What the handler needs to serve a file, derived from one stat() call.
+FileInfo = namedtuple('FileInfo', 'path size mtime etag last_modified mime_type')
+
+
+def get_file_info(file_path, st=None):
+    """
+    Returns a FileInfo for a regular file, or None if there is no such file.
+    `st` may be an os.stat_result the caller already has for the file.
+    The MIME type and header values are cached until the file changes.
+    """
+    if st is None:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    key = str(file_path)
+    stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _file_info_lock:
+        cached = _file_info_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            _file_info_cache.move_to_end(key)
+            return cached[1]
+    ext = os.path.splitext(key)[1].lower()
+    # Extensions added to IMAGE_EXTENSIONS by hand fall back to the registry.
+    mime_type = IMAGE_MIME_TYPES.get(ext) or mimetypes.guess_type(key)[0] or 'application/octet-stream'
+    info = FileInfo(
+        path=file_path,
+        size=st.st_size,
+        mtime=st.st_mtime,
+        etag=f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"',
+        last_modified=email.utils.formatdate(st.st_mtime, usegmt=True),
+        mime_type=mime_type,
+    )
+    with _file_info_lock:
+        _file_info_cache[key] = (stamp, info)
+        _file_info_cache.move_to_end(key)
+        while len(_file_info_cache) > FILE_INFO_CACHE_SIZE:
+            _file_info_cache.popitem(last=False)
+    return info
+
+
+def get_file_body(info):
+    """
+    Returns the contents of a small file described by a FileInfo, reading it
+    into memory on first use. Returns None if the file no longer matches
+    `info`, in which case it should be sent from disk.
+    """
+    global _file_body_cache_bytes
+    key = str(info.path)
+    with _file_body_lock:
+        cached = _file_body_cache.get(key)
+        if cached is not None and cached[0] == info.etag:
+            _file_body_cache.move_to_end(key)
+            return cached[1]
+    try:
+        with open(info.path, 'rb') as f:
+            # The ETag covers the inode, size and mtime, so a replaced or
+            # edited file is never served from a stale copy.
+            current = get_file_info(info.path, os.fstat(f.fileno()))
+            if current is None or current.etag != info.etag:
+                return None
+            body = f.read()
+    except OSError:
+        return None
+    with _file_body_lock:
+        previous = _file_body_cache.pop(key, None)
+        if previous is not None:
+            _file_body_cache_bytes -= len(previous[1])
+        _file_body_cache[key] = (info.etag, body)
+        _file_body_cache_bytes += len(body)
+        # Evict the least recently used files once over the byte budget.
+        while _file_body_cache_bytes > FILE_BODY_CACHE_BYTES:
+            _, (_, evicted) = _file_body_cache.popitem(last=False)
+            _file_body_cache_bytes -= len(evicted)
+    return body
+
+
+def get_encoded_path(file_path, suffix):
+    """
+    Returns where the pre-encoded copy of an image with the given suffix lives.
+    """
+    return os.path.join(ENCODED_DIR, os.path.basename(file_path) + suffix)
+
+
+def precompress_images(directory):
+    """
+    Writes gzip (and, with Brotli installed, Brotli) copies of the compressible
+    images in `directory`, so they can be served without compressing them per
+    request. Copies are stamped with the source's mtime and redone when stale.
+    """
+    with os.scandir(directory) as entries:
+        sources = [e for e in entries
+                   if e.is_file() and os.path.splitext(e.name)[1].lower() in PRECOMPRESS_EXTENSIONS]
+    for entry in sources:
+        try:
+            precompress_image(entry.path, entry.stat())
+        except OSError:
+            # Unreadable sources or a read-only folder: serve the original.
+            continue
+
+
+def precompress_image(file_path, st):
+    """
+    Writes any missing or stale pre-encoded copies of one image.
+    """
+    data = None
+    for _, suffix, compress in ENCODINGS:
+        encoded_path = get_encoded_path(file_path, suffix)
+        try:
+            if os.stat(encoded_path).st_mtime_ns == st.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        os.makedirs(ENCODED_DIR, exist_ok=True)
+        # Write to a temporary name first so no request sees a partial file.
+        tmp_path = f'{encoded_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compress(data))
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, encoded_path)
+
+
+def get_image_list_json(directory):
+    """
+    Returns the sorted list of images in `directory` as encoded JSON, as an
+    (etag, body, gzip_body) tuple.
+    The listing is rebuilt only when the directory's modification time changes,
+    which happens whenever a file is added, removed or renamed.
+    """
+    mtime = os.stat(directory).st_mtime_ns
+    with _listing_lock:
+        if _listing_cache['mtime'] != mtime:
+            _listing_cache.update(mtime=mtime, **build_image_list(directory, mtime))
+        return _listing_cache['etag'], _listing_cache['body'], _listing_cache['gzip_body']
+
+
+def build_image_list(directory, mtime):
+    """
+    Scans `directory` and encodes the image list for the listing cache.
+    """
+    # scandir() reports the entry type from the directory listing itself,
+    # so most entries need no extra stat() call.
+    with os.scandir(directory) as entries:
+        images = sorted(e.name for e in entries
+                        if e.is_file() and os.path.splitext(e.name)[1].lower() in IMAGE_EXTENSIONS)
+    body = json.dumps({'images': images, 'total': len(images)}).encode('utf-8')
+    return {
+        'body': body,
+        'gzip_body': gzip.compress(body, mtime=0),
+        'etag': f'"{mtime:x}"',
+    }
+
+
 def get_html():
     """
     Returns the main HTML content for the gallery page.
@@ -371,7 +895,7 @@ def get_html():
                     const sk = document.createElement('div');
                     sk.className = 'skeleton'; // Placeholder for lazy loading
                     const im = document.createElement('img');
-                    im.dataset.src = '/image/' + n; // Store real source in data attribute
+                    im.dataset.src = '/thumb/' + n; // Store real source in data attribute
                     im.alt = n;
                     const md = document.createElement('div');
                     md.className = 'image-metadata';
@@ -534,11 +1058,162 @@ def get_html():
     </html>"""
 
 
+# The gallery page never changes while the server runs, so encode it once.
+GALLERY_HTML = get_html().encode('utf-8')
+
+
+class GalleryServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server for the gallery.
+    Every connection runs on its own daemon thread, so one slow client does
+    not stall the others and Ctrl+C does not wait for open connections.
+    """
+    daemon_threads = True
+    # A gallery page opens many connections at once; allow a deeper backlog
+    # than the default of 5 so none are refused.
+    request_queue_size = 128
+    # Listen on IPv6 and, through IPv4-mapped addresses, on IPv4 as well.
+    address_family = socket.AF_INET6
+    # Set by start_workers() when worker processes share the port. Left off
+    # otherwise, since any process of the same user could then bind the live
+    # port and take a share of its connections.
+    reuse_port = False
+
+    def server_bind(self):
+        """
+        Makes the socket dual-stack, and shareable with the workers, before
+        binding it.
+        """
+        if self.address_family == socket.AF_INET6:
+            try:
+                self.socket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+            except (AttributeError, OSError) as e:
+                # Some systems only offer IPv6-only sockets, which would shut
+                # out IPv4 clients; fail so create_server() binds IPv4 instead.
+                raise OSError('dual-stack sockets are not supported') from e
+        if self.reuse_port:
+            # Lets worker processes bind their own socket to the same port.
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+class IPv4GalleryServer(GalleryServer):
+    """
+    The gallery server for hosts without IPv6 support.
+    """
+    address_family = socket.AF_INET
+
+
+def create_server(port):
+    """
+    Creates the gallery server on all interfaces, on IPv6 and IPv4 when the
+    host supports IPv6 and on IPv4 only otherwise.
+    """
+    if socket.has_ipv6:
+        try:
+            return GalleryServer(('::', port), ImageGalleryHandler)
+        except OSError:
+            # IPv6 is disabled on this host, sockets cannot be dual-stack, or
+            # the port is taken on IPv6 only; IPv4 is what matters most.
+            pass
+    return IPv4GalleryServer(('0.0.0.0', port), ImageGalleryHandler)
+
+
+def start_workers(port):
+    """
+    Creates the server and forks the extra worker processes configured by
+    WORKER_PROCESSES, each with a server of its own.
+    Returns the server to run in this process and the list of forked process
+    ids, which is None in the workers themselves.
+    Must run before any thread is started, since threads do not survive fork().
+    """
+    # Elsewhere SO_REUSEPORT does not spread TCP accepts, so extra workers
+    # would sit idle.
+    if WORKER_PROCESSES <= 1 or not sys.platform.startswith('linux') or not hasattr(socket, 'SO_REUSEPORT'):
+        return create_server(port), []
+    GalleryServer.reuse_port = True
+    server = create_server(port)
+    worker_pids = []
+    for _ in range(WORKER_PROCESSES - 1):
+        pid = os.fork()
+        if pid == 0:
+            # A socket of its own lets the kernel balance new connections
+            # across the workers, instead of waking them all on one socket.
+            server.server_close()
+            return create_server(port), None
+        worker_pids.append(pid)
+    return server, worker_pids
+
+
 class ImageGalleryHandler(BaseHTTPRequestHandler):
     """
     HTTP request handler for the image gallery server.
     This class defines how to handle different GET requests.
     """
+    # Every response carries a Content-Length, so browsers can keep one
+    # connection open for the whole page instead of reconnecting per image.
+    protocol_version = 'HTTP/1.1'
+    # Kept-alive connections each hold a thread, so drop them once idle.
+    timeout = 60
+    # Paths served as a whole, mapped to the method that handles them.
+    EXACT_ROUTES = {
+        '/': 'serve_gallery',                  # The main gallery page.
+        '/index.html': 'serve_gallery',
+        '/api/images': 'serve_image_list',     # The list of image filenames.
+    }
+    # Path prefixes whose remainder is a filename, with their handler methods.
+    PREFIX_ROUTES = (
+        ('/api/metadata/', 'serve_metadata'),  # Metadata for a specific image.
+        ('/thumb/', 'serve_thumbnail'),        # A downscaled image for the grid.
+        ('/image/', 'serve_image'),            # An actual image file.
+    )
+
+    def setup(self):
+        """
+        Enlarges the connection's send buffer before any response is written.
+        """
+        super().setup()
+        try:
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+        except OSError:
+            # The kernel default still works, just with more wakeups.
+            pass
+
+    def handle_one_request(self):
+        """
+        Handles one request with the socket corked, so the headers and the
+        start of the body leave in full packets instead of a small header
+        packet of their own. Clearing the option flushes the last packet.
+        """
+        self.set_cork(True)
+        try:
+            super().handle_one_request()
+        finally:
+            self.set_cork(False)
+
+    def set_cork(self, enabled):
+        """Sets or clears TCP_CORK where the platform has it."""
+        if CORK_OPTION is None:
+            return
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, CORK_OPTION, int(enabled))
+        except OSError:
+            # The client may already have closed the connection.
+            pass
+
+    def date_time_string(self, timestamp=None):
+        """
+        Returns an HTTP date, formatting the current time only once per second.
+        """
+        global _date_header
+        if timestamp is not None:
+            return super().date_time_string(timestamp)
+        now = int(time.time())
+        cached = _date_header
+        if cached[0] != now:
+            cached = _date_header = (now, email.utils.formatdate(now, usegmt=True))
+        return cached[1]
+
     def log_message(self, format, *args):
         """Suppresses the default logging to keep the console clean."""
         pass
@@ -550,95 +1225,322 @@ class ImageGalleryHandler(BaseHTTPRequestHandler):
         parsed = urlparse(self.path)
         path = unquote(parsed.path)
 
-        if path in ['/', '/index.html']:
-            # Serve the main gallery page.
-            self.serve_gallery()
-        elif path == '/api/images':
-            # Serve the list of image filenames.
-            self.serve_image_list()
-        elif path.startswith('/api/metadata/'):
-            # Serve metadata for a specific image.
-            self.serve_metadata(path[14:])
-        elif path.startswith('/image/'):
-            # Serve an actual image file.
-            self.serve_image(path[7:])
-        else:
-            # Handle unknown paths.
-            self.send_error(404)
+        # Exact paths are a single dictionary lookup.
+        handler = self.EXACT_ROUTES.get(path)
+        if handler is not None:
+            getattr(self, handler)()
+            return
+        # The remaining routes take the rest of the path as a filename.
+        for prefix, handler in self.PREFIX_ROUTES:
+            if path.startswith(prefix):
+                getattr(self, handler)(path[len(prefix):])
+                return
+        # Handle unknown paths.
+        self.send_error(404)
+
+    def do_HEAD(self):
+        """
+        Handles HEAD requests like GET, with the same headers but no body.
+        Thumbnails and metadata that are not cached yet are still rendered or
+        analyzed, since their Content-Length depends on the result.
+        """
+        self.do_GET()
 
     def serve_image_list(self):
         """
         Scans the script's directory for image files and returns a JSON list.
         """
-        script_dir = Path(__file__).parent
-        images = [f.name for f in script_dir.iterdir()
-                  if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS]
-        images.sort()
-
-        response = json.dumps({'images': images, 'total': len(images)})
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.end_headers()
-        self.wfile.write(response.encode('utf-8'))
+        etag, body, gzip_body = get_image_list_json(SCRIPT_DIR)
+        encoding = None
+        if 'gzip' in self.get_accepted_encodings() and len(gzip_body) < len(body):
+            # The gzipped variant needs an ETag of its own.
+            etag, body, encoding = etag[:-1] + '-gz"', gzip_body, 'gzip'
+        # The listing is revalidated on every visit, which costs only a 304
+        # while the folder is unchanged.
+        if self.is_not_modified(etag, None):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        self.send_bytes(body, 'application/json', 'no-cache', etag=etag, encoding=encoding)
 
     def serve_metadata(self, filename):
         """
         Returns a JSON object with metadata for the requested image.
         """
-        script_dir = Path(__file__).parent
-        file_path = script_dir / filename
+        file_path = resolve_image_path(filename)
 
-        if not file_path.is_file():
+        if file_path is None or get_file_info(file_path) is None:
             self.send_error(404)
             return
 
-        metadata = get_image_metadata(file_path)
-        response = json.dumps(metadata)
-
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
+        response = get_metadata_json(file_path)
         # Cache metadata to reduce server load.
-        self.send_header('Cache-Control', 'public, max-age=3600')
-        self.end_headers()
-        self.wfile.write(response.encode('utf-8'))
+        self.send_bytes(response, 'application/json', 'public, max-age=3600')
 
     def serve_gallery(self):
         """
         Serves the main HTML page.
         """
-        html = get_html()
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        self.send_bytes(GALLERY_HTML, 'text/html; charset=utf-8', 'public, max-age=300')
 
     def serve_image(self, filename):
         """
         Serves the raw binary data for an image file.
         """
-        script_dir = Path(__file__).parent
-        file_path = script_dir / filename
+        file_path = resolve_image_path(filename)
+        info = get_file_info(file_path) if file_path is not None else None
 
-        if not file_path.is_file() or file_path.suffix.lower() not in IMAGE_EXTENSIONS:
+        if info is None:
             self.send_error(404)
             return
 
-        try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
+        # Ranges refer to the identity encoding, so only whole files are sent
+        # from a pre-encoded copy.
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in PRECOMPRESS_EXTENSIONS and 'Range' not in self.headers:
+            accepted = self.get_accepted_encodings()
+            for encoding, suffix, _ in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                encoded = get_file_info(get_encoded_path(file_path, suffix))
+                # Use the copy only if it is current and actually smaller.
+                if encoded is not None and encoded.mtime == info.mtime and encoded.size < info.size:
+                    self.send_file(encoded, info.mime_type, encoding)
+                    return
+
+        self.send_file(info)
+
+    def serve_thumbnail(self, filename):
+        """
+        Serves a downscaled copy of an image for the gallery grid.
+        Falls back to the original image when no thumbnail can be made.
+        """
+        file_path = resolve_image_path(filename)
+        info = get_file_info(file_path) if file_path is not None else None
 
-            # Guess the MIME type of the image.
-            mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
-            self.send_response(200)
-            self.send_header('Content-type', mime_type)
-            self.send_header('Content-length', len(content))
-            # Set a long cache time for images as they are static.
+        if info is None:
+            self.send_error(404)
+            return
+
+        thumb_path = get_thumbnail(file_path)
+        thumb_info = get_file_info(thumb_path) if thumb_path is not None else None
+        self.send_file(thumb_info or info)
+
+    def send_file(self, info, mime_type=None, encoding=None):
+        """
+        Sends a file as the response body, from memory if it is small.
+        Answers with 304 Not Modified when the client's cached copy is current,
+        and with 206 Partial Content when a single byte range is requested.
+        A pre-encoded copy is sent with its `encoding` and the original's
+        `mime_type`.
+        """
+        if self.is_not_modified(info.etag, info.mtime):
+            self.send_response(304)
+            self.send_header('ETag', info.etag)
+            self.send_header('Last-Modified', info.last_modified)
             self.send_header('Cache-Control', 'public, max-age=31536000')
             self.end_headers()
-            self.wfile.write(content)
-        except Exception as e:
+            return
+        body = get_file_body(info) if info.size <= SMALL_FILE_SIZE else None
+        if body is not None:
+            # Small, hot files such as thumbnails are sent from memory.
+            with memoryview(body) as view:
+                self.send_file_content(info, mime_type, encoding, view)
+            return
+        try:
+            f = open(info.path, 'rb')
+        except OSError as e:
             self.send_error(500, str(e))
+            return
+        with f:
+            # Revalidate against the open file in case it changed since stat().
+            info = get_file_info(info.path, os.fstat(f.fileno()))
+            self.send_file_content(info, mime_type, encoding, f)
+
+    def send_file_content(self, info, mime_type, encoding, source):
+        """
+        Sends the status, headers and body of a file, or of the byte range
+        the client asked for. `source` is the open file, or a memoryview of
+        its contents when it is cached in memory.
+        """
+        size = info.size
+        byte_range = self.get_byte_range(size, info.etag, info.last_modified)
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if byte_range is None:
+            offset, count = 0, size
+            self.send_response(200)
+        else:
+            start, end = byte_range
+            offset, count = start, end - start + 1
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-type', mime_type or info.mime_type)
+        self.send_header('Content-length', count)
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        # Compressible images are answered differently per Accept-Encoding.
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', info.etag)
+        self.send_header('Last-Modified', info.last_modified)
+        # Set a long cache time for images as they are static.
+        self.send_header('Cache-Control', 'public, max-age=31536000')
+        if self.command == 'HEAD':
+            self.end_headers()
+            return
+        try:
+            if isinstance(source, memoryview):
+                with source[offset:offset + count] as chunk:
+                    self.end_headers_with_body(chunk)
+            else:
+                self.end_headers()
+                self.write_file(source, offset, count)
+        except (OSError, BufferError):
+            # The headers are already out, so the response cannot be turned
+            # into an error; drop the connection instead. BufferError means a
+            # memory map could not be closed after an aborted write.
+            self.close_connection = True
+
+    def get_accepted_encodings(self):
+        """
+        Returns the content codings the client accepts, per Accept-Encoding.
+        """
+        accepted = set()
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            coding, _, params = item.partition(';')
+            # An explicit q=0 means the client refuses that coding.
+            if params.replace(' ', '').lower() in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                continue
+            accepted.add(coding.strip().lower())
+        return accepted
+
+    def get_byte_range(self, size, etag, last_modified):
+        """
+        Parses a single-range `Range: bytes=...` request header (RFC 7233).
+        Returns an inclusive (start, end) pair, None to send the whole file,
+        or False when the range lies entirely outside the file.
+        """
+        header = self.headers.get('Range')
+        if header is None:
+            return None
+        # If-Range asks for the range only while the file is unchanged.
+        if_range = self.headers.get('If-Range')
+        if if_range is not None and if_range not in (etag, last_modified):
+            return None
+        match = RANGE_PATTERN.fullmatch(header.strip())
+        if match is None:
+            # Multiple ranges and malformed headers are answered in full.
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+        elif last:
+            # A suffix range: the final `last` bytes of the file.
+            start, end = max(size - int(last), 0), size - 1
+            if int(last) == 0:
+                return False
+        else:
+            return None
+        if start >= size:
+            return False
+        return start, end
+
+    def is_not_modified(self, etag, mtime):
+        """
+        Checks the request's conditional headers against a file's validators.
+        If-None-Match takes precedence over If-Modified-Since, as in RFC 7232.
+        `mtime` may be None for responses that only have an ETag.
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            # Weak comparison: a W/ prefix on the client's tag is ignored.
+            return '*' in tags or any(tag.replace('W/', '', 1) == etag for tag in tags)
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None or mtime is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        # HTTP dates have one-second resolution.
+        return int(mtime) <= since.timestamp()
+
+    def send_bytes(self, body, content_type, cache_control, etag=None, encoding=None):
+        """
+        Sends an in-memory response body, optionally with an ETag and, for a
+        body that is already encoded, its Content-Encoding.
+        """
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        if etag is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        if self.command == 'HEAD':
+            self.end_headers()
+        else:
+            self.end_headers_with_body(body)
+
+    def end_headers_with_body(self, body):
+        """
+        Ends the headers and writes them together with an in-memory body, so
+        the whole response goes out in a single send() call.
+        """
+        # send_header() collects the header lines in _headers_buffer, which
+        # end_headers() would otherwise write on its own.
+        chunks = getattr(self, '_headers_buffer', [])
+        if self.request_version != 'HTTP/0.9':
+            chunks.append(b'\r\n')
+        chunks.append(body)
+        self._headers_buffer = []
+        self.wfile.write(b''.join(chunks))
+
+    def write_file(self, f, offset, count):
+        """
+        Writes `count` bytes of an open file, starting at `offset`, to the client.
+        socket.sendfile() lets the kernel copy the file straight to the socket
+        via os.sendfile(). Elsewhere large files are written from a memory map
+        and small ones in fixed-size blocks, so no private copy of a whole
+        image is ever made.
+        """
+        self.wfile.flush()
+        if hasattr(os, 'sendfile'):
+            self.connection.sendfile(f, offset, count)
+            return
+        if count >= MMAP_THRESHOLD:
+            # Map large files so that concurrent requests share the page cache
+            # rather than each reading a private copy of the data.
+            # The slice is released by its own `with`, even when the client
+            # disconnects, so the map can always be closed.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view, \
+                    view[offset:offset + count] as chunk:
+                self.wfile.write(chunk)
+            return
+        # Larger blocks than the 8 KiB socket.sendfile() would fall back to.
+        f.seek(offset)
+        while count > 0:
+            block = f.read(min(count, COPY_BUFFER_SIZE))
+            if not block:
+                # The file shrank while it was being sent.
+                break
+            self.wfile.write(block)
+            count -= len(block)
 
 
 def main():
@@ -648,7 +1550,25 @@ def main():
     port = find_available_port()
     local_ip = get_local_ip()
 
-    server = HTTPServer(('0.0.0.0', port), ImageGalleryHandler)
+    # Scan the folder now so the first visitor gets the listing from memory,
+    # and pick up the metadata computed by earlier runs.
+    get_image_list_json(SCRIPT_DIR)
+    load_metadata_cache()
+    # Fork before any thread starts; the workers inherit the caches above.
+    server, worker_pids = start_workers(port)
+    if worker_pids is None:
+        # Workers only serve requests; background work, the startup messages
+        # and saving the caches are left to the first process.
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+    # Encode compressible images in the background so startup is not delayed;
+    # until a copy is ready the original is served.
+    threading.Thread(target=precompress_images, args=(SCRIPT_DIR,), daemon=True).start()
+    # Likewise render thumbnails ahead of the first visit.
+    threading.Thread(target=create_missing_thumbnails, args=(SCRIPT_DIR,), daemon=True).start()
 
     # --- Startup Messages ---
     print("=" * 60)
@@ -667,9 +1587,15 @@ def main():
     print("=" * 60)
     print(f"Local access:   http://localhost:{port}")
     print(f"Network access: http://{local_ip}:{port}")
+    if worker_pids:
+        print(f"Worker processes: {len(worker_pids) + 1}")
     print("=" * 60)
     if PIL_AVAILABLE:
         print("PIL/Pillow detected - Full metadata features enabled")
+        if PIL_SIMD:
+            print("  Pillow-SIMD detected - Fast thumbnail resizing enabled")
+        else:
+            print("  For faster thumbnails, install Pillow-SIMD: pip install pillow-simd")
     else:
         print("PIL/Pillow not found - Install with: pip install Pillow")
         print("  (Basic features work without Pillow)")
@@ -684,6 +1610,13 @@ def main():
         # Handle graceful shutdown on Ctrl+C.
         print("\n\nServer stopped.")
         server.shutdown()
+        for pid in worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                # The worker already exited on the same Ctrl+C.
+                pass
+        save_metadata_cache()
 
 
 if __name__ == '__main__':